@@ -0,0 +1,17 @@
+"""Shared types for the week 2 TripSmith agents."""
+
+from typing import Any, NamedTuple, Optional, Tuple
+
+
+class AgentResponse(NamedTuple):
+    """Standard envelope returned by every agent.
+
+    A NamedTuple, so the planner's internal hot path can unpack responses
+    with single tuple bytecodes while external callers keep the
+    .data/.reasoning attribute API. Instances remain immutable and carry no
+    per-object __dict__. date_ordinals optionally carries schedule dates as
+    integers for the planner's tuple-compare validation.
+    """
+    data: Any
+    reasoning: str
+    date_ordinals: Optional[Tuple[int, ...]] = None
@@ -1,31 +1,42 @@
 import asyncio
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+from common import AgentResponse
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class AgentResponse:
-    data: Any
-    reasoning: str
+
+@lru_cache(maxsize=2048)
+def _flight_options(origin: str, destination: str, date: str) -> Tuple[Dict[str, Any], ...]:
+    """Simulated flight results for a route/date, built once per triple.
+
+    Related requests usually repeat the same origin/destination/date, so the
+    dicts are allocated once and shared across responses. They stay plain
+    dicts (treat them as read-only) so downstream json/orjson serialization
+    and the planner's deep-copying itinerary cache keep working.
+    """
+    return (
+        {"flight_number": "TS123", "origin": origin, "destination": destination, "date": date, "price": 150},
+        {"flight_number": "TS456", "origin": origin, "destination": destination, "date": date, "price": 200},
+    )
+
 
 class FlightAgent:
     def __init__(self):
         logger.debug("FlightAgent initialized")
 
     async def search_flights(self, origin: str, destination: str, date: str) -> AgentResponse:
-        logger.debug(f"Searching flights from {origin} to {destination} on {date}")
-        # Simulated flight data retrieval logic
-        flights = [
-            {"flight_number": "TS123", "origin": origin, "destination": destination, "date": date, "price": 150},
-            {"flight_number": "TS456", "origin": origin, "destination": destination, "date": date, "price": 200}
-        ]
+        logger.debug("Searching flights from %s to %s on %s", origin, destination, date)
+        # Simulated flight data retrieval logic; the per-route results are
+        # cached templates shared between repeated searches.
+        flights = _flight_options(origin, destination, date)
         reasoning = (
             f"Found {len(flights)} flights from {origin} to {destination} on {date}. "
             "Flights selected based on lowest price and availability."
         )
-        logger.debug(f"Flight search result: {flights}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Flight search result: %s", flights)
         return AgentResponse(data=flights, reasoning=reasoning)
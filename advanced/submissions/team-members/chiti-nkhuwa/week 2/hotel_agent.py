@@ -1,27 +1,87 @@
+import asyncio
+import heapq
 import logging
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Protocol
 
-# Set up logging for debugging and reasoning
-logging.basicConfig(level=logging.DEBUG)
+from common import AgentResponse
+
+# Module logger; logging configuration is left to the application so that
+# importing this module does not install handlers or set levels.
 logger = logging.getLogger(__name__)
 
-@dataclass
-class AgentResponse:
-    data: List[Dict[str, Any]]
-    reasoning: str
+# Static hotel catalog, hoisted to module level so it is built once at import
+# instead of on every search. Stored as parallel tuples (struct-of-arrays) so
+# the guest/availability filter walks contiguous immutable sequences instead
+# of hashing dict keys per hotel. In a real implementation this would come
+# from a database or API.
+_HOTEL_NAMES = (
+    "Grand Plaza Hotel",
+    "City Lights Inn",
+    "Comfort Suites",
+    "Luxury Stay",
+    "Budget Inn",
+    "Downtown Hotel",
+)
+_HOTEL_MAX_GUESTS = (2, 4, 3, 5, 2, 4)
+_HOTEL_RATINGS = (4.5, 4.0, 4.2, 4.8, 3.8, 4.3)
+_HOTEL_AVAILABLE = (True, True, False, True, True, True)
+
+
+class CatalogBackend(Protocol):
+    """Backend that answers one batched catalog query per agent call.
+
+    Real implementations translate the filters into a single
+    ``WHERE location = ... AND max_guests >= ...`` style query so the
+    planner never issues one round-trip per candidate (the classic N+1
+    pattern).
+    """
+
+    async def batch_get(self, catalog: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ...
+
+
+class StaticCatalogBackend:
+    """In-memory backend over the module-level hotel catalog.
+
+    The catalog is tiny (far below the ~100-entry point where batching
+    machinery starts paying for itself), so batch_get just filters the
+    parallel tuples directly in one pass.
+    """
+
+    async def batch_get(self, catalog: str, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if catalog != "hotels":
+            raise ValueError(f"Unknown catalog: {catalog!r}")
+        location = filters.get("location")
+        min_guests = filters.get("min_guests", 0)
+        return [
+            {
+                "name": _HOTEL_NAMES[i],
+                "location": location,
+                "max_guests": max_guests,
+                "rating": _HOTEL_RATINGS[i],
+                "available": True,
+            }
+            for i, (max_guests, available)
+            in enumerate(zip(_HOTEL_MAX_GUESTS, _HOTEL_AVAILABLE))
+            if available and max_guests >= min_guests
+        ]
+
 
 class HotelAgent:
-    def __init__(self):
+    def __init__(self, backend: Optional[CatalogBackend] = None):
         # Initialize the agent, could include API keys, config, etc.
+        self.backend = backend if backend is not None else StaticCatalogBackend()
         logger.debug("Initializing HotelAgent")
 
-    def search_hotels(self, location: str, check_in: str, check_out: str, guests: int, max_results: int = 5) -> AgentResponse:
+    async def search_hotels(self, location: str, check_in: str, check_out: str, guests: int, max_results: int = 5) -> AgentResponse:
         """
         Search for hotels based on location, check-in/check-out dates, and number of guests.
         Returns an AgentResponse containing hotel data and the reasoning behind the search.
         """
-        logger.debug(f"Starting hotel search for location={location}, check_in={check_in}, check_out={check_out}, guests={guests}, max_results={max_results}")
+        logger.debug(
+            "Starting hotel search for location=%s, check_in=%s, check_out=%s, guests=%d, max_results=%d",
+            location, check_in, check_out, guests, max_results
+        )
 
         # Reasoning: We want to find hotels in the specified location that can accommodate the number of guests,
         # available for the given dates, limiting the number of results to max_results.
@@ -29,38 +89,31 @@ class HotelAgent:
             f"Searching for up to {max_results} hotels in {location} that can accommodate {guests} guests "
             f"from {check_in} to {check_out}."
         )
-        logger.info(f"Reasoning: {reasoning}")
-
-        # For demonstration, we use a static list of hotels. In a real implementation, this would query a database or API.
-        hotels = [
-            {"name": "Grand Plaza Hotel", "location": location, "max_guests": 2, "rating": 4.5, "available": True},
-            {"name": "City Lights Inn", "location": location, "max_guests": 4, "rating": 4.0, "available": True},
-            {"name": "Comfort Suites", "location": location, "max_guests": 3, "rating": 4.2, "available": False},
-            {"name": "Luxury Stay", "location": location, "max_guests": 5, "rating": 4.8, "available": True},
-            {"name": "Budget Inn", "location": location, "max_guests": 2, "rating": 3.8, "available": True},
-            {"name": "Downtown Hotel", "location": location, "max_guests": 4, "rating": 4.3, "available": True},
-        ]
-        logger.debug(f"Initial hotel list: {hotels}")
-
-        # Filter hotels that can accommodate the number of guests and are available
-        filtered_hotels = [hotel for hotel in hotels if hotel["max_guests"] >= guests and hotel["available"]]
-        logger.debug(f"Filtered hotels for guests >= {guests} and availability: {filtered_hotels}")
+        logger.info("Reasoning: %s", reasoning)
 
-        # Sort by rating descending
-        sorted_hotels = sorted(filtered_hotels, key=lambda x: x["rating"], reverse=True)
-        logger.debug(f"Sorted hotels by rating: {sorted_hotels}")
+        # One batched backend query fetches every qualifying hotel at once
+        # instead of one lookup per candidate.
+        filtered_hotels = await self.backend.batch_get(
+            "hotels", {"location": location, "min_guests": guests}
+        )
+        logger.debug("Backend returned %d qualifying hotels", len(filtered_hotels))
 
-        # Limit to max_results
-        limited_hotels = sorted_hotels[:max_results]
-        logger.debug(f"Limited hotels to max_results={max_results}: {limited_hotels}")
+        # Take the top max_results by rating: heap selection is O(N log k)
+        # instead of fully sorting the filtered list.
+        limited_hotels = heapq.nlargest(max_results, filtered_hotels, key=lambda h: h["rating"])
+        # Guard the full-list dump so the dict reprs are never built unless
+        # DEBUG is actually enabled.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Limited hotels to max_results=%d: %s", max_results, limited_hotels)
 
         return AgentResponse(data=limited_hotels, reasoning=reasoning)
 
 
 # Example usage (can be removed or commented out in production)
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
     agent = HotelAgent()
-    response = agent.search_hotels("New York", "2024-07-01", "2024-07-05", 3, 3)
+    response = asyncio.run(agent.search_hotels("New York", "2024-07-01", "2024-07-05", 3, 3))
     print("Reasoning:", response.reasoning)
     print("Hotels found:")
     for hotel in response.data:
@@ -1,15 +1,12 @@
 import logging
-from dataclasses import dataclass
+from collections import defaultdict
 from typing import List, Dict, Any
 
-# Setup logging configuration
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
+from common import AgentResponse
 
-@dataclass
-class AgentResponse:
-    data: List[Dict[str, Any]]
-    reasoning: str
+# Module logger; logging configuration is left to the application so that
+# importing this module does not install handlers or set levels.
+logger = logging.getLogger(__name__)
 
 class POIAgent:
     def __init__(self, pois: List[Dict[str, Any]]):
@@ -18,7 +15,17 @@ class POIAgent:
         Each POI is expected to be a dictionary with keys including 'name', 'category', 'rating', and 'location'.
         """
         self.pois = pois
-        logger.debug(f"POIAgent initialized with {len(pois)} POIs.")
+        # Inverted index: (lowercased location, category) -> POI indices,
+        # pre-sorted by rating descending. Built once here, so each query is
+        # a dict lookup plus a slice instead of a linear scan and sort; the
+        # sorting cost is amortized across all queries.
+        self._index: Dict[Any, List[int]] = defaultdict(list)
+        for i, poi in enumerate(pois):
+            key = (poi.get('location', '').lower(), poi.get('category', '').lower())
+            self._index[key].append(i)
+        for idxs in self._index.values():
+            idxs.sort(key=lambda i: -pois[i].get('rating', 0))
+        logger.debug("POIAgent initialized with %d POIs.", len(pois))
 
     def search_pois(self, location: str, category: str, max_results: int = 5) -> AgentResponse:
         """
@@ -32,31 +39,24 @@ class POIAgent:
         Returns:
         - AgentResponse containing the filtered POIs and reasoning.
         """
-        logger.debug(f"Searching POIs for location='{location}', category='{category}', max_results={max_results}")
-
-        # Filter POIs by location and category
-        filtered_pois = [
-            poi for poi in self.pois
-            if poi.get('location', '').lower() == location.lower()
-            and poi.get('category', '').lower() == category.lower()
-        ]
-        logger.debug(f"Found {len(filtered_pois)} POIs matching location and category.")
+        logger.debug("Searching POIs for location='%s', category='%s', max_results=%d", location, category, max_results)
 
-        # Sort POIs by rating descending
-        sorted_pois = sorted(filtered_pois, key=lambda x: x.get('rating', 0), reverse=True)
-        logger.debug("POIs sorted by rating descending.")
+        # One index lookup fetches the matching POIs already sorted by rating
+        # descending; slicing takes the top max_results.
+        idxs = self._index.get((location.lower(), category.lower()), [])
+        logger.debug("Found %d POIs matching location and category.", len(idxs))
 
-        # Limit results to max_results
-        limited_pois = sorted_pois[:max_results]
-        logger.debug(f"Returning top {len(limited_pois)} POIs.")
+        limited_pois = [self.pois[i] for i in idxs[:max_results]]
+        logger.debug("Returning top %d POIs.", len(limited_pois))
 
         reasoning = (f"Searched for POIs in location '{location}' with category '{category}'. "
-                     f"Found {len(filtered_pois)} matches, returning top {len(limited_pois)} by rating.")
+                     f"Found {len(idxs)} matches, returning top {len(limited_pois)} by rating.")
 
         return AgentResponse(data=limited_pois, reasoning=reasoning)
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
     sample_pois = [
         {'name': 'Central Park', 'category': 'park', 'rating': 4.7, 'location': 'New York'},
         {'name': 'Metropolitan Museum of Art', 'category': 'museum', 'rating': 4.8, 'location': 'New York'},